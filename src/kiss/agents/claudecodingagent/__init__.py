@@ -7,6 +7,7 @@
 
 from kiss.agents.claudecodingagent.claude_coding_agent import (
     BUILTIN_TOOLS,
+    CUSTOM_TOOLS,
     SYSTEMS_PROMPT,
     ClaudeCodingAgent,
     TaskResult,
@@ -14,6 +15,7 @@ from kiss.agents.claudecodingagent.claude_coding_agent import (
 
 __all__ = [
     "BUILTIN_TOOLS",
+    "CUSTOM_TOOLS",
     "SYSTEMS_PROMPT",
     "ClaudeCodingAgent",
     "TaskResult",
@@ -7,30 +7,51 @@
 
 This module provides a coding agent that uses the Claude Agent SDK to generate
 tested Python programs. The agent can use various built-in tools (Read, Bash,
-WebSearch, etc.) and custom tools like read_project_file.
+WebSearch, etc.) and custom tools like read_project_files.
 """
 
+from __future__ import annotations
+
+import bisect
+import codecs
+import functools
+import importlib.util
+import json
+import os
+import re
+import sys
+from collections.abc import Callable, Iterable
 from pathlib import Path
-from typing import Any
-
-import anyio
-from claude_agent_sdk import (
-    AssistantMessage,
-    ClaudeAgentOptions,
-    PermissionResultAllow,
-    PermissionResultDeny,
-    ResultMessage,
-    TextBlock,
-    ToolPermissionContext,
-    ToolResultBlock,
-    ToolUseBlock,
-    UserMessage,
-    query,
-)
+from typing import TYPE_CHECKING, Any
+
 from pydantic import BaseModel, Field
 
 from kiss.core import DEFAULT_CONFIG
 
+# The SDK and anyio are imported where they are used, so importing this module
+# stays cheap for code that does not run the agent
+if TYPE_CHECKING:
+    from claude_agent_sdk import (
+        AssistantMessage,
+        PermissionResultAllow,
+        PermissionResultDeny,
+        ResultMessage,
+        TextBlock,
+        ToolPermissionContext,
+        ToolResultBlock,
+        ToolUseBlock,
+        UserMessage,
+    )
+
+# Prefer orjson for parsing agent results when the optional extra is installed
+_json_loads: Callable[[str], Any]
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Built-in tools available in Claude Agent SDK
 # These can be enabled via the allowed_tools parameter
 BUILTIN_TOOLS = {
@@ -45,6 +66,43 @@ BUILTIN_TOOLS = {
     "WebFetch": "Fetch and process content from a URL",
 }
 
+# Custom tools served in-process by the agent through an SDK MCP server
+CUSTOM_TOOLS = {
+    "read_project_files": "Read several project files in a single call",
+}
+_MCP_SERVER_NAME = "kiss"
+
+# Names of all tools the agent may use, as passed to the SDK
+_ALLOWED_TOOLS: tuple[str, ...] = tuple(BUILTIN_TOOLS) + tuple(
+    f"mcp__{_MCP_SERVER_NAME}__{name}" for name in CUSTOM_TOOLS
+)
+
+# Maximum number of bytes read_project_files returns per file
+_READ_PROJECT_FILES_MAX_BYTES = 100_000
+
+_READ_PROJECT_FILES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "paths": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Paths of the files to read, relative to the working directory",
+        }
+    },
+    "required": ["paths"],
+}
+
+# Tools whose path argument is checked against the readable/writable whitelists
+_READ_TOOLS = frozenset({"Read", "Grep", "Glob"})
+_WRITE_TOOLS = frozenset({"Write", "Edit", "MultiEdit"})
+_TOOL_KIND = {t: "r" for t in _READ_TOOLS} | {t: "w" for t in _WRITE_TOOLS}
+
+# Matches a fenced (optionally ```json) code block in the agent's result text
+_JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*\n?(.*?)\n?```", re.DOTALL)
+
+# Escapes line breaks so a tool result is displayed on a single line
+_NEWLINE_ESCAPES = str.maketrans({"\n": "\\n", "\r": "\\r"})
+
 
 # System prompt for generating robust, tested code
 SYSTEMS_PROMPT = """You are an expert Python programmer who writes clean, simple, \
@@ -72,7 +130,7 @@ and robust code.
 
 ## Available Tools
 You have access to the following tools to help with your task:
-- read_project_file: Read files from the project directory
+- read_project_files: Read several project files in a single call
 - WebSearch: Search the web for documentation, examples, or solutions
 - WebFetch: Fetch content from a specific URL
 - Read: Read files from the working directory
@@ -84,6 +142,9 @@ Use these tools when you need to:
 - Find examples of similar implementations
 - Understand existing code in the project
 
+When you need the contents of several files, batch the independent reads into a
+single read_project_files call instead of issuing one Read call per file.
+
 ## Output Format
 Return a dict of the form by carefully and rigorously introspecting on your work.
 ```python
@@ -122,27 +183,308 @@ class TaskResult(BaseModel):
         )
     )
 
+
+# JSON schema of TaskResult, passed as the structured output format on every run
+_TASK_RESULT_SCHEMA = TaskResult.model_json_schema()
+
+
+def _fmt_arg(value: Any) -> str:
+    """Repr a tool argument for display, clipping long strings (also nested) before the repr."""
+    return repr(_clip(value, 64))[:50]
+
+
+def _format_tool_use(block: ToolUseBlock) -> str:
+    args_str = ", ".join(f"{k}={_fmt_arg(v)}" for k, v in block.input.items())
+    return f"[TOOL] {block.name}({args_str})"
+
+
+def _format_text(block: TextBlock) -> str:
+    return f"Claude: {block.text}"
+
+
+def _format_tool_result(block: ToolResultBlock) -> str:
+    status = "ERROR" if block.is_error else "OK"
+    return f"  -> [{status}] {_short_display(block.content)}"
+
+
+@functools.cache
+def _assistant_block_formatters() -> dict[type[Any], Callable[[Any], str]]:
+    """Display formatters for AssistantMessage content blocks, keyed by exact block type."""
+    from claude_agent_sdk import TextBlock, ToolUseBlock
+
+    return {ToolUseBlock: _format_tool_use, TextBlock: _format_text}
+
+
+@functools.cache
+def _user_block_formatters() -> dict[type[Any], Callable[[Any], str]]:
+    """Display formatters for UserMessage content blocks, keyed by exact block type."""
+    from claude_agent_sdk import ToolResultBlock
+
+    return {ToolResultBlock: _format_tool_result}
+
+
+@functools.cache
+def _message_handler_names() -> dict[type[Any], str]:
+    """Names of the agent methods handling streamed SDK messages, keyed by exact type."""
+    from claude_agent_sdk import AssistantMessage, ResultMessage, UserMessage
+
+    return {
+        AssistantMessage: "_on_assistant_message",
+        UserMessage: "_on_user_message",
+        ResultMessage: "_on_result_message",
+    }
+
+
+def _read_capped(path: str, limit: int) -> str:
+    """Read a UTF-8 file, keeping at most ``limit`` bytes and marking truncation."""
+    with open(path, "rb") as f:
+        data = f.read(limit + 1)
+    truncated = len(data) > limit
+    # When truncating, a non-final decode drops a multi-byte character cut at the
+    # limit; otherwise a final decode raises on invalid trailing bytes
+    text = codecs.getincrementaldecoder("utf-8")().decode(data[:limit], final=not truncated)
+    if truncated:
+        text += f"\n... [truncated: file is larger than {limit} bytes]"
+    return text
+
+
+def _deny(message: str) -> PermissionResultDeny:
+    from claude_agent_sdk import PermissionResultDeny
+
+    return PermissionResultDeny(behavior="deny", message=message)
+
+
+def _clip(value: Any, width: int) -> Any:
+    """Shorten long strings, also inside dicts, lists and tuples, to ``width`` head and tail.
+
+    The repr of a clipped value starts and ends with the same ``width`` characters
+    as the repr of the original value.
+    """
+    if isinstance(value, str) and len(value) > 2 * width:
+        return value[:width] + "..." + value[-width:]
+    if isinstance(value, bytes) and len(value) > 2 * width:
+        return value[:width] + b"..." + value[-width:]
+    if isinstance(value, dict):
+        return {k: _clip(v, width) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clip(v, width) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_clip(v, width) for v in value)
+    return value
+
+
+def _edge_reprs(items: Iterable[Any], limit: int, width: int) -> list[str]:
+    """Collect reprs of clipped items until they cover at least ``limit`` characters."""
+    parts: list[str] = []
+    size = 0
+    for item in items:
+        part = repr(_clip(item, width))
+        parts.append(part)
+        size += len(part) + 2
+        if size > limit:
+            break
+    return parts
+
+
+def _short_display(content: Any, width: int = 100) -> str:
+    """Render tool result content as at most ``width`` head and tail characters.
+
+    List content (the structured form the SDK sends) is repr'd item by item from
+    each end, with long strings inside items (e.g. the "text" of a text block)
+    clipped first, so large tool outputs are never materialized as one string
+    just to be truncated.
+    """
+    if isinstance(content, str):
+        text = content if len(content) <= 2 * width else (
+            content[:width] + "..." + content[-width:]
+        )
+        return text.translate(_NEWLINE_ESCAPES)
+    if isinstance(content, bytes):
+        if len(content) <= 2 * width:
+            text = repr(content)
+            if len(text) <= 2 * width:
+                return text
+        return repr(content[:width])[:width] + "..." + repr(content[-width:])[-width:]
+    if isinstance(content, list):
+        head = _edge_reprs(content, 2 * width, width)
+        head_str = "[" + ", ".join(head)
+        if len(head) == len(content) and len(head_str) < 2 * width:
+            return head_str + "]"
+        tail_str = ", ".join(reversed(_edge_reprs(reversed(content), width, width))) + "]"
+        return head_str[:width] + "..." + tail_str[-width:]
+    content_str = str(content)
+    if len(content_str) > 2 * width:
+        return content_str[:width] + "..." + content_str[-width:]
+    return content_str
+
+
+class _OneShotPrompt:
+    """Async iterable that yields a single prompt message for streaming mode.
+
+    The can_use_tool callback requires streaming mode, which needs the prompt
+    to be provided as an AsyncIterable with proper message structure.
+    """
+
+    def __init__(self, message: dict[str, Any]):
+        self._message = message
+        self._done = False
+
+    def __aiter__(self) -> _OneShotPrompt:
+        return self
+
+    async def __anext__(self) -> dict[str, Any]:
+        if self._done:
+            raise StopAsyncIteration
+        self._done = True
+        return self._message
+
+
+def _as_prefixes(paths: Iterable[Path]) -> tuple[str, ...]:
+    """Convert whitelisted directories to prefix strings ending in a separator.
+
+    The prefixes are sorted and directories nested inside another whitelisted
+    directory are dropped, so at most one prefix can match a path and it is the
+    one found by bisection in _is_subpath.
+    """
+    prefixes: list[str] = []
+    for prefix in sorted(os.path.join(str(p), "") for p in paths):
+        if not prefixes or not prefix.startswith(prefixes[-1]):
+            prefixes.append(prefix)
+    return tuple(prefixes)
+
+
 class ClaudeCodingAgent:
     def __init__(
         self,
         model_name: str,
         readable_paths: list[str] | None = None,
         writable_paths: list[str] | None = None,
-        base_dir: str = str(Path(DEFAULT_CONFIG.agent.artifact_dir).resolve() / "claude_workdir")
+        base_dir: str = str(Path(DEFAULT_CONFIG.agent.artifact_dir).resolve() / "claude_workdir"),
+        tool_concurrency: int | None = None,
+        verbose: bool | None = None,
     ):
+        from claude_agent_sdk import (
+            ClaudeAgentOptions,
+            PermissionResultAllow,
+            create_sdk_mcp_server,
+            tool,
+        )
+
         if readable_paths is None:
             readable_paths = []
         if writable_paths is None:
             writable_paths = []
-        self.base_dir = base_dir
-        Path(self.base_dir).mkdir(parents=True, exist_ok=True)
-        self.model_name = model_name
+        # model_name, base_dir and tool_concurrency are baked into the SDK options
+        # below, so they are exposed as read-only properties
+        self._base_dir = base_dir
+        self._base_path = Path(base_dir)
+        self._base_path.mkdir(parents=True, exist_ok=True)
+        self._model_name = model_name
+        # Print the agent trace only to interactive terminals unless set explicitly
+        if verbose is None:
+            verbose = DEFAULT_CONFIG.agent.verbose and sys.stdout.isatty()
+        self.verbose = verbose
+        # Whitelists are stored with symlinks resolved. The lexical prefixes also
+        # cover each path as given, so tool paths spelled either way pass the
+        # filesystem-free first check in _in_whitelist
         self.readable_paths = {Path(p).resolve() for p in readable_paths}
         self.writable_paths = {Path(p).resolve() for p in writable_paths}
+        self._readable_prefixes = _as_prefixes(
+            self.readable_paths | {Path(os.path.abspath(p)) for p in readable_paths}
+        )
+        self._writable_prefixes = _as_prefixes(
+            self.writable_paths | {Path(os.path.abspath(p)) for p in writable_paths}
+        )
+        self._readable_real_prefixes = _as_prefixes(self.readable_paths)
+        self._writable_real_prefixes = _as_prefixes(self.writable_paths)
+        # An empty whitelist leaves that kind of access unrestricted
+        self._read_unrestricted = not self.readable_paths
+        self._write_unrestricted = not self.writable_paths
+        # Maximum number of independent tool calls from one assistant turn that the
+        # Claude Code runtime executes concurrently (None keeps the runtime default)
+        env_limit = os.environ.get("TOOL_CONCURRENCY_LIMIT", "").strip()
+        if tool_concurrency is None and env_limit:
+            if not env_limit.isdigit() or int(env_limit) < 1:
+                raise ValueError(
+                    f"TOOL_CONCURRENCY_LIMIT must be a positive integer, got {env_limit!r}"
+                )
+            tool_concurrency = int(env_limit)
+        if tool_concurrency is not None and tool_concurrency < 1:
+            raise ValueError(f"tool_concurrency must be positive, got {tool_concurrency}")
+        self._tool_concurrency = tool_concurrency
+        # Shared allow decision returned by the permission handler
+        self._allow = PermissionResultAllow(behavior="allow")
+        # Options are read-only for the SDK, so one instance is shared by all runs
+        read_project_files = tool(
+            "read_project_files", CUSTOM_TOOLS["read_project_files"], _READ_PROJECT_FILES_SCHEMA
+        )(self._read_project_files)
+        self._options = ClaudeAgentOptions(
+            model=model_name,
+            system_prompt=SYSTEMS_PROMPT,
+            output_format=_TASK_RESULT_SCHEMA,
+            can_use_tool=self.permission_handler,
+            permission_mode="default",  # Use default mode so can_use_tool callback is invoked
+            allowed_tools=list(_ALLOWED_TOOLS),
+            cwd=self._base_path,
+            env=self._runtime_env(),
+            mcp_servers={
+                _MCP_SERVER_NAME: create_sdk_mcp_server(
+                    name=_MCP_SERVER_NAME, tools=[read_project_files]
+                )
+            },
+        )
+
+    @property
+    def model_name(self) -> str:
+        """The Claude model used by every run of this agent."""
+        return self._model_name
+
+    @property
+    def base_dir(self) -> str:
+        """The working directory of the agent's tools."""
+        return self._base_dir
+
+    @property
+    def tool_concurrency(self) -> int | None:
+        """Maximum concurrent tool calls per turn, or None for the runtime default."""
+        return self._tool_concurrency
+
+    def _is_subpath(self, target: str | Path, prefixes: tuple[str, ...]) -> bool:
+        """Checks if the target path is or is inside any of the whitelisted paths.
+
+        Args:
+            target: The absolute, normalized path to check.
+            prefixes: Whitelisted directories as returned by _as_prefixes.
+
+        Returns:
+            True if the target equals or lies below one of the whitelisted paths.
+        """
+        target_str = os.path.join(os.fspath(target), "")
+        index = bisect.bisect_right(prefixes, target_str)
+        return index > 0 and target_str.startswith(prefixes[index - 1])
 
-    def _is_subpath(self, target: Path, whitelist: set[Path]) -> bool:
-        """Checks if the target path is or is inside any of the whitelisted paths."""
-        return any(target == p or p in target.parents for p in whitelist)
+    def _in_whitelist(
+        self, path_str: str, prefixes: tuple[str, ...], real_prefixes: tuple[str, ...]
+    ) -> bool:
+        """Checks if a tool path is inside a whitelist, following symlinks.
+
+        The lexical check rejects paths outside the whitelist without touching the
+        filesystem. Paths that pass it are confirmed with os.path.realpath, so a
+        symlink inside a whitelisted directory cannot lead outside of it.
+
+        Args:
+            path_str: The path passed to the tool. Relative paths are resolved
+                against base_dir, the working directory of the agent's tools.
+            prefixes: Lexical prefixes of the whitelist, as given and resolved.
+            real_prefixes: Prefixes of the whitelist with symlinks resolved.
+
+        Returns:
+            True if the path, with symlinks resolved, lies inside the whitelist.
+        """
+        target = os.path.abspath(os.path.join(self.base_dir, path_str))
+        return self._is_subpath(target, prefixes) and self._is_subpath(
+            os.path.realpath(target), real_prefixes
+        )
 
     async def permission_handler(
         self,
@@ -160,119 +502,203 @@ class ClaudeCodingAgent:
         Returns:
             PermissionResultAllow or PermissionResultDeny based on path restrictions.
         """
-        path_str = tool_input.get("file_path") or tool_input.get("path")
+        kind = _TOOL_KIND.get(tool_name)
+        if kind is None:
+            return self._allow
+        if self._read_unrestricted if kind == "r" else self._write_unrestricted:
+            return self._allow
 
+        path_str = tool_input.get("file_path") or tool_input.get("path")
         if not path_str:
-            return PermissionResultAllow(behavior="allow")
-
-        target_path = Path(path_str).resolve()
+            return self._allow
 
         # Enforce Read Restrictions
-        if tool_name in ["Read", "Grep", "Glob"]:
-            if len(self.readable_paths) == 0 or self._is_subpath(
-                target_path, self.readable_paths
+        if kind == "r":
+            if self._in_whitelist(
+                path_str, self._readable_prefixes, self._readable_real_prefixes
             ):
-                return PermissionResultAllow(behavior="allow")
+                return self._allow
             msg = f"Access Denied: {path_str} is not in readable whitelist."
-            return PermissionResultDeny(behavior="deny", message=msg)
+            return _deny(msg)
 
         # Enforce Write Restrictions
-        if tool_name in ["Write", "Edit", "MultiEdit"]:
-            if len(self.writable_paths) == 0 or self._is_subpath(
-                target_path, self.writable_paths
-            ):
-                return PermissionResultAllow(behavior="allow")
-            msg = f"Access Denied: {path_str} is not in writable whitelist."
-            return PermissionResultDeny(behavior="deny", message=msg)
+        if self._in_whitelist(path_str, self._writable_prefixes, self._writable_real_prefixes):
+            return self._allow
+        msg = f"Access Denied: {path_str} is not in writable whitelist."
+        return _deny(msg)
 
-        return PermissionResultAllow(behavior="allow")
+    async def _read_project_files(self, args: dict[str, Any]) -> dict[str, Any]:
+        """Reads several files concurrently for the read_project_files tool.
 
-    async def _prompt_stream(self, task: str) -> Any:
-        """Wrap the task prompt as an async iterable for streaming mode.
+        Args:
+            args: The tool input with a "paths" list, resolved against base_dir.
 
-        The can_use_tool callback requires streaming mode, which needs the prompt
-        to be provided as an AsyncIterable with proper message structure.
+        Returns:
+            A tool result whose text is a JSON object mapping each requested path
+            to its content (truncated to _READ_PROJECT_FILES_MAX_BYTES bytes) or
+            an error message, or an is_error result if paths is not a list of
+            strings.
         """
-        yield {
-            "type": "user",
-            "message": {"role": "user", "content": task}
-        }
+        import anyio
+
+        paths = args.get("paths")
+        if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+            message = f"Error: paths must be a list of strings, got {paths!r}"
+            return {"content": [{"type": "text", "text": message}], "is_error": True}
+        contents = dict.fromkeys(paths, "")
+
+        async def _read_one(path_str: str) -> None:
+            if not self._read_unrestricted and not self._in_whitelist(
+                path_str, self._readable_prefixes, self._readable_real_prefixes
+            ):
+                contents[path_str] = f"Access Denied: {path_str} is not in readable whitelist."
+                return
+            try:
+                contents[path_str] = await anyio.to_thread.run_sync(
+                    _read_capped,
+                    os.path.join(self.base_dir, path_str),
+                    _READ_PROJECT_FILES_MAX_BYTES,
+                )
+            except (OSError, UnicodeDecodeError) as e:
+                contents[path_str] = f"Error: {e}"
+
+        async with anyio.create_task_group() as tg:
+            for path_str in contents:
+                tg.start_soon(_read_one, path_str)
+        return {"content": [{"type": "text", "text": json.dumps(contents, ensure_ascii=False)}]}
+
+    def _runtime_env(self) -> dict[str, str]:
+        """Environment variables passed to the Claude Code runtime."""
+        if self.tool_concurrency is None:
+            return {}
+        return {"CLAUDE_CODE_MAX_TOOL_USE_CONCURRENCY": str(self.tool_concurrency)}
 
     async def run(self, task: str) -> dict[str, object] | None:
-        options = ClaudeAgentOptions(
-            model=self.model_name,
-            system_prompt=SYSTEMS_PROMPT,
-            output_format=TaskResult.model_json_schema(),
-            can_use_tool=self.permission_handler,
-            permission_mode="default",  # Use default mode so can_use_tool callback is invoked
-            allowed_tools=list(BUILTIN_TOOLS.keys()),
-            cwd=str(self.base_dir)
-        )
+        from claude_agent_sdk import query
 
+        handlers = self._message_handlers()
         final_result: dict[str, object] | None = None
         # Use the standalone query() function with streaming prompt for can_use_tool support
-        async for message in query(prompt=self._prompt_stream(task), options=options):
-            # Handle AssistantMessage which contains ToolUseBlock and TextBlock
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, ToolUseBlock):
-                        args_str = ", ".join(
-                            f"{k}={repr(v)[:50]}" for k, v in block.input.items()
-                        )
-                        print(f"[TOOL] {block.name}({args_str})")
-
-                    elif isinstance(block, TextBlock):
-                        print(f"Claude: {block.text}")
-
-            # Handle UserMessage which contains ToolResultBlock
-            elif isinstance(message, UserMessage):
-                for content_block in message.content:
-                    if isinstance(content_block, ToolResultBlock):
-                        content = content_block.content
-                        if isinstance(content, str):
-                            if len(content) > 200:
-                                display = content[:100] + "..." + content[-100:]
-                            else:
-                                display = content
-                            display = display.replace("\n", "\\n")
-                        else:
-                            content_str = str(content)
-                            display = content_str[:100] + "..." + content_str[-100:]
-                        status = "ERROR" if content_block.is_error else "OK"
-                        print(f"  -> [{status}] {display}")
-
-            elif isinstance(message, ResultMessage):
-                # Try structured_output first, fall back to parsing result
-                if message.structured_output is not None:
-                    final_result = message.structured_output  # type: ignore[assignment]
-                elif message.result:
-                    # Try to extract JSON from result text
-                    final_result = self._parse_result_json(message.result)
+        prompt = _OneShotPrompt(
+            {"type": "user", "message": {"role": "user", "content": task}}
+        )
+        async for message in query(prompt=prompt, options=self._options):
+            handler = handlers.get(type(message))
+            if handler is not None:
+                result = handler(message)
+                if result is not None:
+                    final_result = result
 
         return final_result
 
+    def _message_handlers(
+        self,
+    ) -> dict[type[Any], Callable[[Any], dict[str, object] | None]]:
+        """Bound message handlers keyed by message type, honoring subclass overrides."""
+        return {
+            message_type: getattr(self, name)
+            for message_type, name in _message_handler_names().items()
+        }
+
+    def _display_blocks(
+        self, blocks: Iterable[Any], formatters: dict[type[Any], Callable[[Any], str]]
+    ) -> None:
+        """Display the content blocks that have a formatter, in one write."""
+        lines = []
+        for block in blocks:
+            formatter = formatters.get(type(block))
+            if formatter is not None:
+                lines.append(formatter(block))
+        # Write the whole message at once instead of one print per block
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+
+    def _on_assistant_message(self, message: AssistantMessage) -> None:
+        """Display the ToolUseBlock and TextBlock content of an assistant turn."""
+        if self.verbose:
+            self._display_blocks(message.content, _assistant_block_formatters())
+
+    def _on_user_message(self, message: UserMessage) -> None:
+        """Display the ToolResultBlock content of a user message."""
+        if self.verbose and not isinstance(message.content, str):
+            self._display_blocks(message.content, _user_block_formatters())
+
+    def _on_result_message(self, message: ResultMessage) -> dict[str, object] | None:
+        """Extract the final result, preferring structured_output over the result text."""
+        if message.structured_output is not None:
+            return message.structured_output  # type: ignore[no-any-return]
+        if message.result:
+            # Try to extract JSON from result text
+            return self._parse_result_json(message.result)
+        return None
+
+    async def arun_many(
+        self, tasks: list[str], max_concurrency: int = 8
+    ) -> list[dict[str, object] | Exception | None]:
+        """Run independent tasks concurrently on this agent.
+
+        Each task gets its own SDK session, and run() keeps its per-session state
+        local. All sessions share this agent's working directory (base_dir) and
+        whitelists, so tasks that write the same file overwrite each other; give
+        tasks distinct file names, or use one agent per base_dir, when that matters.
+        A task whose session raises does not cancel the other tasks; the exception
+        is returned in that task's result slot.
+
+        Args:
+            tasks: The task descriptions to run.
+            max_concurrency: Maximum number of sessions running at the same time.
+
+        Returns:
+            For each task, in the same order as tasks, the result of run() or the
+            exception its session raised.
+        """
+        import anyio
+
+        results: list[dict[str, object] | Exception | None] = [None] * len(tasks)
+        limiter = anyio.CapacityLimiter(max_concurrency)
+
+        async def _run_one(index: int, task: str) -> None:
+            async with limiter:
+                try:
+                    results[index] = await self.run(task)
+                except Exception as e:
+                    results[index] = e
+
+        async with anyio.create_task_group() as tg:
+            for index, task in enumerate(tasks):
+                tg.start_soon(_run_one, index, task)
+        return results
+
     def _parse_result_json(self, result: str) -> dict[str, object] | None:
         """Parse JSON from result text, handling markdown code blocks."""
-        import json
-        import re
+        stripped = result.strip()
+
+        # Raw JSON is the common case, so try it before scanning for a code block
+        if stripped.startswith("{"):
+            try:
+                return _json_loads(stripped)  # type: ignore[return-value, no-any-return]
+            except json.JSONDecodeError:
+                pass
 
         # Try to extract JSON from markdown code block
-        json_match = re.search(r"```(?:json)?\s*\n?(.*?)\n?```", result, re.DOTALL)
+        json_match = _JSON_BLOCK_RE.search(result)
         if json_match:
             try:
-                return json.loads(json_match.group(1).strip())  # type: ignore[return-value, no-any-return]
+                return _json_loads(json_match.group(1).strip())  # type: ignore[return-value, no-any-return]
             except json.JSONDecodeError:
                 pass
 
-        # Try to parse as raw JSON
-        try:
-            return json.loads(result.strip())  # type: ignore[return-value, no-any-return]
-        except json.JSONDecodeError:
-            pass
+        if not stripped.startswith("{"):
+            # Try to parse as raw JSON of another shape (e.g. a list)
+            try:
+                return _json_loads(stripped)  # type: ignore[return-value, no-any-return]
+            except json.JSONDecodeError:
+                pass
 
         # Return a basic result if we can't parse JSON
         return {"status": True, "summary": result[:500], "insights": ""}
 
+
 async def main() -> None:
     project_root = Path(DEFAULT_CONFIG.agent.artifact_dir).resolve()
     agent = ClaudeCodingAgent(
@@ -294,7 +720,13 @@ async def main() -> None:
         print(f"INSIGHTS: {result['insights']}")
 
 if __name__ == "__main__":
-    anyio.run(main)
+    import anyio
+
+    # Use uvloop for the asyncio event loop when the optional extra is installed
+    if importlib.util.find_spec("uvloop") is not None:
+        anyio.run(main, backend="asyncio", backend_options={"use_uvloop": True})
+    else:
+        anyio.run(main)
 
 
 
@@ -10,7 +10,12 @@ NO MOCKS are used - all tests exercise actual behavior.
 """
 
 import asyncio
+import contextlib
+import io
+import json
 import os
+import subprocess
+import sys
 import tempfile
 import unittest
 from pathlib import Path
@@ -18,6 +23,12 @@ from pathlib import Path
 from kiss.agents.claudecodingagent import (
     ClaudeCodingAgent,
 )
+from kiss.agents.claudecodingagent.claude_coding_agent import (
+    _as_prefixes,
+    _fmt_arg,
+    _OneShotPrompt,
+    _short_display,
+)
 from kiss.core import DEFAULT_CONFIG
 
 
@@ -47,21 +58,48 @@ class TestClaudeCodingAgentPermissions(unittest.TestCase):
     def test_is_subpath_for_exact_match(self):
         """Test _is_subpath returns True for exact path match."""
         target = Path(self.readable_dir).resolve()
-        whitelist = {Path(self.readable_dir).resolve()}
+        whitelist = _as_prefixes({Path(self.readable_dir).resolve()})
         self.assertTrue(self.agent._is_subpath(target, whitelist))
 
     def test_is_subpath_for_child_path(self):
         """Test _is_subpath returns True for child paths."""
         child_path = Path(self.readable_dir, "subdir", "file.txt").resolve()
-        whitelist = {Path(self.readable_dir).resolve()}
+        whitelist = _as_prefixes({Path(self.readable_dir).resolve()})
         self.assertTrue(self.agent._is_subpath(child_path, whitelist))
 
     def test_is_subpath_for_unrelated_path(self):
         """Test _is_subpath returns False for unrelated paths."""
         unrelated = Path("/tmp/unrelated/path").resolve()
-        whitelist = {Path(self.readable_dir).resolve()}
+        whitelist = _as_prefixes({Path(self.readable_dir).resolve()})
         self.assertFalse(self.agent._is_subpath(unrelated, whitelist))
 
+    def test_is_subpath_for_sibling_with_common_prefix(self):
+        """Test _is_subpath rejects siblings that share a name prefix."""
+        sibling = Path(self.readable_dir + "_other", "file.txt").resolve()
+        whitelist = _as_prefixes({Path(self.readable_dir).resolve()})
+        self.assertFalse(self.agent._is_subpath(sibling, whitelist))
+
+    def test_is_subpath_for_root_whitelist(self):
+        """Test _is_subpath treats the filesystem root as containing everything."""
+        target = Path(self.readable_dir, "file.txt").resolve()
+        whitelist = _as_prefixes({Path("/")})
+        self.assertTrue(self.agent._is_subpath(target, whitelist))
+
+    def test_as_prefixes_drops_nested_paths(self):
+        """Test _as_prefixes sorts prefixes and drops nested whitelist entries."""
+        prefixes = _as_prefixes({Path("/c"), Path("/a/b"), Path("/a"), Path("/ab")})
+        self.assertEqual(prefixes, ("/a/", "/ab/", "/c/"))
+
+    def test_is_subpath_with_many_whitelisted_paths(self):
+        """Test _is_subpath finds the matching entry among many whitelisted paths."""
+        whitelist = _as_prefixes(
+            {Path(f"/data/repo{i}") for i in range(100)} | {Path("/data/repo5/sub")}
+        )
+        self.assertTrue(self.agent._is_subpath("/data/repo5/other/file.py", whitelist))
+        self.assertTrue(self.agent._is_subpath("/data/repo42", whitelist))
+        self.assertFalse(self.agent._is_subpath("/data/repo100/file.py", whitelist))
+        self.assertFalse(self.agent._is_subpath("/data/file.py", whitelist))
+
     def test_permission_handler_allows_read_in_readable_path(self):
         """Test permission_handler allows Read for readable paths."""
         from claude_agent_sdk import PermissionResultAllow, ToolPermissionContext
@@ -82,6 +120,63 @@ class TestClaudeCodingAgentPermissions(unittest.TestCase):
         )
         self.assertIsInstance(result, PermissionResultDeny)
 
+    def test_permission_handler_denies_read_escaping_with_dotdot(self):
+        """Test permission_handler normalizes '..' before checking the whitelist."""
+        from claude_agent_sdk import PermissionResultDeny, ToolPermissionContext
+        file_path = os.path.join(self.readable_dir, "..", "writable", "test.txt")
+        context = ToolPermissionContext()
+        result = asyncio.run(
+            self.agent.permission_handler("Read", {"path": file_path}, context)
+        )
+        self.assertIsInstance(result, PermissionResultDeny)
+
+    def test_permission_handler_denies_write_through_symlink_out_of_whitelist(self):
+        """Test a symlink inside the writable dir cannot be used to write outside it."""
+        from claude_agent_sdk import PermissionResultDeny, ToolPermissionContext
+        outside_dir = os.path.join(self.temp_dir, "outside")
+        os.makedirs(outside_dir)
+        link = os.path.join(self.writable_dir, "link")
+        os.symlink(outside_dir, link)
+        context = ToolPermissionContext()
+        result = asyncio.run(
+            self.agent.permission_handler(
+                "Write", {"file_path": os.path.join(link, "x.txt")}, context
+            )
+        )
+        self.assertIsInstance(result, PermissionResultDeny)
+
+    def test_permission_handler_allows_whitelist_given_through_symlink(self):
+        """Test a whitelist given via a symlinked path allows both spellings."""
+        from claude_agent_sdk import PermissionResultAllow, ToolPermissionContext
+        alias = os.path.join(self.temp_dir, "alias")
+        os.symlink(self.writable_dir, alias)
+        agent = ClaudeCodingAgent(
+            model_name="claude-sonnet-4-5", writable_paths=[alias], base_dir=self.temp_dir
+        )
+        context = ToolPermissionContext()
+        for file_path in [os.path.join(alias, "a.txt"), os.path.join(self.writable_dir, "a.txt")]:
+            result = asyncio.run(
+                agent.permission_handler("Write", {"file_path": file_path}, context)
+            )
+            self.assertIsInstance(result, PermissionResultAllow)
+
+    def test_permission_handler_resolves_relative_paths_against_base_dir(self):
+        """Test relative tool paths are checked relative to base_dir."""
+        from claude_agent_sdk import (
+            PermissionResultAllow,
+            PermissionResultDeny,
+            ToolPermissionContext,
+        )
+        context = ToolPermissionContext()
+        result = asyncio.run(
+            self.agent.permission_handler("Read", {"path": "readable/test.txt"}, context)
+        )
+        self.assertIsInstance(result, PermissionResultAllow)
+        result = asyncio.run(
+            self.agent.permission_handler("Write", {"path": "readable/test.txt"}, context)
+        )
+        self.assertIsInstance(result, PermissionResultDeny)
+
     def test_permission_handler_allows_write_in_writable_path(self):
         """Test permission_handler allows Write for writable paths."""
         from claude_agent_sdk import PermissionResultAllow, ToolPermissionContext
@@ -111,6 +206,26 @@ class TestClaudeCodingAgentPermissions(unittest.TestCase):
         )
         self.assertIsInstance(result, PermissionResultAllow)
 
+    def test_permission_handler_allows_unrestricted_tool_with_path(self):
+        """Test permission_handler ignores paths for tools without restrictions."""
+        from claude_agent_sdk import PermissionResultAllow, ToolPermissionContext
+        context = ToolPermissionContext()
+        result = asyncio.run(
+            self.agent.permission_handler("Bash", {"path": "/tmp/outside"}, context)
+        )
+        self.assertIsInstance(result, PermissionResultAllow)
+
+    def test_permission_handler_allows_all_with_empty_whitelists(self):
+        """Test permission_handler allows any path when whitelists are empty."""
+        from claude_agent_sdk import PermissionResultAllow, ToolPermissionContext
+        agent = ClaudeCodingAgent(model_name="claude-sonnet-4-5", base_dir=self.temp_dir)
+        context = ToolPermissionContext()
+        for tool_name in ["Read", "Write"]:
+            result = asyncio.run(
+                agent.permission_handler(tool_name, {"path": "/tmp/outside/x"}, context)
+            )
+            self.assertIsInstance(result, PermissionResultAllow)
+
     def test_permission_handler_handles_file_path_key(self):
         """Test permission_handler handles 'file_path' key."""
         from claude_agent_sdk import PermissionResultAllow, ToolPermissionContext
@@ -210,6 +325,401 @@ class TestClaudeCodingAgentPermissions(unittest.TestCase):
         self.assertIsInstance(result, PermissionResultDeny)
 
 
+class TestClaudeCodingAgentBaseDir(unittest.TestCase):
+    """Tests for ClaudeCodingAgent working directory setup."""
+
+    def test_base_dir_recreated_after_removal(self):
+        """Test a new agent recreates a base_dir deleted after an earlier agent."""
+        import shutil
+        temp_dir = tempfile.mkdtemp()
+        base_dir = os.path.join(temp_dir, "work")
+        try:
+            ClaudeCodingAgent(model_name="claude-sonnet-4-5", base_dir=base_dir)
+            shutil.rmtree(base_dir)
+            ClaudeCodingAgent(model_name="claude-sonnet-4-5", base_dir=base_dir)
+            self.assertTrue(os.path.isdir(base_dir))
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+class TestReadProjectFiles(unittest.TestCase):
+    """Tests for the read_project_files custom tool."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.readable_dir = os.path.join(self.temp_dir, "readable")
+        os.makedirs(self.readable_dir)
+        Path(self.readable_dir, "a.py").write_text("print('a')\n")
+        Path(self.readable_dir, "b.py").write_text("print('b')\n")
+        Path(self.temp_dir, "secret.txt").write_text("secret")
+
+        self.agent = ClaudeCodingAgent(
+            model_name="claude-sonnet-4-5",
+            readable_paths=[self.readable_dir],
+            base_dir=self.temp_dir
+        )
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _read(self, paths):
+        result = asyncio.run(self.agent._read_project_files({"paths": paths}))
+        return json.loads(result["content"][0]["text"])
+
+    def test_reads_multiple_files_in_order(self):
+        """Test all requested files are returned keyed by path in request order."""
+        contents = self._read(["readable/b.py", "readable/a.py"])
+        self.assertEqual(list(contents), ["readable/b.py", "readable/a.py"])
+        self.assertEqual(contents["readable/a.py"], "print('a')\n")
+        self.assertEqual(contents["readable/b.py"], "print('b')\n")
+
+    def test_denies_files_outside_readable_paths(self):
+        """Test files outside the readable whitelist are not read."""
+        contents = self._read(["secret.txt"])
+        self.assertTrue(contents["secret.txt"].startswith("Access Denied"))
+
+    def test_reports_missing_files(self):
+        """Test missing files are reported as errors without failing the call."""
+        contents = self._read(["readable/missing.py", "readable/a.py"])
+        self.assertTrue(contents["readable/missing.py"].startswith("Error"))
+        self.assertEqual(contents["readable/a.py"], "print('a')\n")
+
+    def test_denies_symlink_out_of_readable_paths(self):
+        """Test a symlink inside the readable dir cannot be used to read outside it."""
+        os.symlink(os.path.join(self.temp_dir, "secret.txt"), os.path.join(self.readable_dir, "s"))
+        contents = self._read(["readable/s"])
+        self.assertTrue(contents["readable/s"].startswith("Access Denied"))
+
+    def test_truncates_large_files(self):
+        """Test files above the size cap are truncated and marked as such."""
+        from kiss.agents.claudecodingagent.claude_coding_agent import (
+            _READ_PROJECT_FILES_MAX_BYTES,
+        )
+        Path(self.readable_dir, "big.txt").write_text("é" * _READ_PROJECT_FILES_MAX_BYTES)
+        contents = self._read(["readable/big.txt"])
+        self.assertIn("[truncated", contents["readable/big.txt"])
+        self.assertLess(len(contents["readable/big.txt"]), _READ_PROJECT_FILES_MAX_BYTES)
+
+    def test_rejects_paths_that_are_not_a_list_of_strings(self):
+        """Test a non-list paths argument yields an error result, not per-character reads."""
+        for paths in ["readable/a.py", ["readable/a.py", 3], None]:
+            result = asyncio.run(self.agent._read_project_files({"paths": paths}))
+            self.assertTrue(result["is_error"])
+            self.assertIn("list of strings", result["content"][0]["text"])
+
+    def test_keeps_non_ascii_text_unescaped(self):
+        """Test non-ASCII file content is returned as is rather than \\u-escaped."""
+        Path(self.readable_dir, "u.txt").write_text("héllo 日本", encoding="utf-8")
+        result = asyncio.run(self.agent._read_project_files({"paths": ["readable/u.txt"]}))
+        self.assertIn("héllo 日本", result["content"][0]["text"])
+
+    def test_reports_invalid_utf8_at_end_of_file(self):
+        """Test a file ending in an incomplete UTF-8 sequence is reported as an error."""
+        Path(self.readable_dir, "bad.txt").write_bytes(b"ok\xe6\x97")
+        contents = self._read(["readable/bad.txt"])
+        self.assertTrue(contents["readable/bad.txt"].startswith("Error"))
+
+    def test_tool_is_registered_with_sdk(self):
+        """Test the tool is allowed and served by the kiss MCP server."""
+        self.assertIn("mcp__kiss__read_project_files", self.agent._options.allowed_tools)
+        self.assertIn("kiss", self.agent._options.mcp_servers)
+
+
+class TestClaudeCodingAgentToolConcurrency(unittest.TestCase):
+    """Tests for ClaudeCodingAgent tool concurrency configuration."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        os.environ.pop("TOOL_CONCURRENCY_LIMIT", None)
+
+    def test_tool_concurrency_passed_to_runtime(self):
+        """Test an explicit tool_concurrency is forwarded to the runtime env."""
+        agent = ClaudeCodingAgent(
+            model_name="claude-sonnet-4-5", base_dir=self.temp_dir, tool_concurrency=4
+        )
+        self.assertEqual(
+            agent._runtime_env(), {"CLAUDE_CODE_MAX_TOOL_USE_CONCURRENCY": "4"}
+        )
+
+    def test_options_settings_are_read_only(self):
+        """Test settings baked into the SDK options cannot be changed after construction."""
+        agent = ClaudeCodingAgent(
+            model_name="claude-sonnet-4-5", base_dir=self.temp_dir, tool_concurrency=2
+        )
+        for name, value in [
+            ("model_name", "claude-opus-4-1"),
+            ("base_dir", "/tmp/other"),
+            ("tool_concurrency", 8),
+        ]:
+            with self.assertRaises(AttributeError):
+                setattr(agent, name, value)
+        self.assertEqual(agent._options.model, "claude-sonnet-4-5")
+        self.assertEqual(str(agent._options.cwd), self.temp_dir)
+        self.assertEqual(agent._options.env, {"CLAUDE_CODE_MAX_TOOL_USE_CONCURRENCY": "2"})
+
+    def test_tool_concurrency_from_env_var(self):
+        """Test tool_concurrency defaults to TOOL_CONCURRENCY_LIMIT."""
+        os.environ["TOOL_CONCURRENCY_LIMIT"] = "3"
+        agent = ClaudeCodingAgent(model_name="claude-sonnet-4-5", base_dir=self.temp_dir)
+        self.assertEqual(agent.tool_concurrency, 3)
+
+    def test_tool_concurrency_env_var_must_be_positive_integer(self):
+        """Test invalid TOOL_CONCURRENCY_LIMIT values raise a descriptive ValueError."""
+        for value in ["abc", "0", "-2", "1.5"]:
+            os.environ["TOOL_CONCURRENCY_LIMIT"] = value
+            with self.assertRaisesRegex(ValueError, "TOOL_CONCURRENCY_LIMIT"):
+                ClaudeCodingAgent(model_name="claude-sonnet-4-5", base_dir=self.temp_dir)
+
+    def test_tool_concurrency_unset_keeps_runtime_default(self):
+        """Test no override is passed when tool_concurrency is not configured."""
+        os.environ.pop("TOOL_CONCURRENCY_LIMIT", None)
+        agent = ClaudeCodingAgent(model_name="claude-sonnet-4-5", base_dir=self.temp_dir)
+        self.assertEqual(agent._runtime_env(), {})
+
+    def test_tool_concurrency_rejects_non_positive(self):
+        """Test tool_concurrency below one raises ValueError."""
+        with self.assertRaises(ValueError):
+            ClaudeCodingAgent(
+                model_name="claude-sonnet-4-5", base_dir=self.temp_dir, tool_concurrency=0
+            )
+
+
+class TestClaudeCodingAgentParseResult(unittest.TestCase):
+    """Tests for ClaudeCodingAgent result text parsing."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.agent = ClaudeCodingAgent(model_name="claude-sonnet-4-5", base_dir=self.temp_dir)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_parse_raw_json(self):
+        """Test raw JSON result text is parsed directly."""
+        result = self.agent._parse_result_json(
+            '  {"status": true, "summary": "done", "insights": ""}\n'
+        )
+        self.assertEqual(result, {"status": True, "summary": "done", "insights": ""})
+
+    def test_parse_json_code_block(self):
+        """Test JSON inside a markdown code block is extracted."""
+        text = 'Here it is:\n```json\n{"status": false, "summary": "s", "insights": "i"}\n```'
+        result = self.agent._parse_result_json(text)
+        self.assertEqual(result, {"status": False, "summary": "s", "insights": "i"})
+
+    def test_parse_plain_text_falls_back(self):
+        """Test non-JSON result text falls back to a summary-only result."""
+        result = self.agent._parse_result_json("All done.")
+        self.assertEqual(result, {"status": True, "summary": "All done.", "insights": ""})
+
+
+class TestShortDisplay(unittest.TestCase):
+    """Tests for tool result display truncation."""
+
+    def test_short_string_escapes_newlines(self):
+        """Test short strings are kept whole with line breaks escaped."""
+        self.assertEqual(_short_display("a\nb\r"), "a\\nb\\r")
+
+    def test_long_string_keeps_head_and_tail(self):
+        """Test long strings are cut to head and tail."""
+        display = _short_display("h" * 150 + "t" * 150)
+        self.assertEqual(display, "h" * 100 + "..." + "t" * 100)
+
+    def test_short_list_matches_str(self):
+        """Test short structured content is rendered like str()."""
+        content = [{"type": "text", "text": "hello"}]
+        self.assertEqual(_short_display(content), str(content))
+
+    def test_other_content_matches_str(self):
+        """Test non-list content such as tuples is rendered like str()."""
+        self.assertEqual(_short_display((1,)), "(1,)")
+        self.assertEqual(_short_display(None), "None")
+
+    def test_long_list_keeps_head_and_tail(self):
+        """Test long structured content is cut to the same head and tail as str()."""
+        content = [{"type": "text", "text": str(i) * 50} for i in range(10)]
+        full = str(content)
+        self.assertEqual(_short_display(content), full[:100] + "..." + full[-100:])
+
+    def test_large_text_block_keeps_head_and_tail(self):
+        """Test a huge text block is shown with the same head and tail as str()."""
+        content = [{"type": "text", "text": "a" * 1_000_000 + "\n" + "z" * 1_000_000}]
+        full = str(content)
+        self.assertEqual(_short_display(content), full[:100] + "..." + full[-100:])
+
+    def test_large_text_block_is_not_materialized(self):
+        """Test displaying a huge text block does not allocate its full repr."""
+        import tracemalloc
+        content = [{"type": "text", "text": "x" * 5_000_000}]
+        tracemalloc.start()
+        _short_display(content)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertLess(peak, 100_000)
+
+    def test_bytes_display_is_width_bounded(self):
+        """Test bytes content is cut to head and tail like other content."""
+        self.assertEqual(_short_display(b"abc"), "b'abc'")
+        self.assertLessEqual(len(_short_display(bytes(500))), 203)
+
+
+class TestFmtArg(unittest.TestCase):
+    """Tests for tool argument display formatting."""
+
+    def test_short_value_matches_repr(self):
+        """Test short arguments are shown as their repr."""
+        self.assertEqual(_fmt_arg("main.py"), repr("main.py"))
+        self.assertEqual(_fmt_arg(42), "42")
+
+    def test_long_string_is_truncated(self):
+        """Test long string arguments are cut to the display width."""
+        self.assertEqual(_fmt_arg("x" * 100_000), repr("x" * 100_000)[:50])
+
+    def test_nested_long_string_is_clipped(self):
+        """Test long strings inside containers (e.g. MultiEdit edits) are clipped."""
+        import tracemalloc
+        edits = [{"old_string": "x" * 5_000_000, "new_string": "y"}]
+        tracemalloc.start()
+        display = _fmt_arg(edits)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertEqual(display, repr(edits)[:50])
+        self.assertLess(peak, 100_000)
+
+
+class TestOneShotPrompt(unittest.TestCase):
+    """Tests for the single-message streaming prompt."""
+
+    def test_yields_message_once(self):
+        """Test the prompt yields exactly its message and then stops."""
+        message = {"type": "user", "message": {"role": "user", "content": "task"}}
+
+        async def collect():
+            return [item async for item in _OneShotPrompt(message)]
+
+        self.assertEqual(asyncio.run(collect()), [message])
+
+
+class TestClaudeCodingAgentMessageHandlers(unittest.TestCase):
+    """Tests for ClaudeCodingAgent handling of streamed SDK messages."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.agent = ClaudeCodingAgent(
+            model_name="claude-sonnet-4-5", base_dir=self.temp_dir, verbose=True
+        )
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_assistant_message_prints_tool_use_and_text(self):
+        """Test tool calls and text of an assistant turn are printed in order."""
+        from claude_agent_sdk import AssistantMessage, TextBlock, ToolUseBlock
+        message = AssistantMessage(
+            content=[
+                ToolUseBlock(id="1", name="Read", input={"file_path": "a.py"}),
+                TextBlock(text="done"),
+            ],
+            model="claude-sonnet-4-5",
+        )
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.agent._on_assistant_message(message)
+        self.assertEqual(out.getvalue(), "[TOOL] Read(file_path='a.py')\nClaude: done\n")
+
+    def test_user_message_prints_tool_result_status(self):
+        """Test tool results are printed with their status."""
+        from claude_agent_sdk import ToolResultBlock, UserMessage
+        message = UserMessage(
+            content=[ToolResultBlock(tool_use_id="1", content="boom", is_error=True)]
+        )
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.agent._on_user_message(message)
+        self.assertEqual(out.getvalue(), "  -> [ERROR] boom\n")
+
+    def test_user_message_ignores_text_blocks(self):
+        """Test only tool results of a user message are printed."""
+        from claude_agent_sdk import TextBlock, ToolResultBlock, UserMessage
+        message = UserMessage(
+            content=[TextBlock(text="prompt"), ToolResultBlock(tool_use_id="1", content="ok")]
+        )
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.agent._on_user_message(message)
+        self.assertEqual(out.getvalue(), "  -> [OK] ok\n")
+
+    def test_non_verbose_agent_prints_nothing(self):
+        """Test message handlers stay silent when verbose is False."""
+        from claude_agent_sdk import AssistantMessage, TextBlock
+        self.agent.verbose = False
+        message = AssistantMessage(content=[TextBlock(text="done")], model="claude-sonnet-4-5")
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.agent._on_assistant_message(message)
+        self.assertEqual(out.getvalue(), "")
+
+    def test_message_handlers_use_subclass_overrides(self):
+        """Test message dispatch calls handlers overridden in a subclass."""
+        from claude_agent_sdk import ToolResultBlock, UserMessage
+
+        class RecordingAgent(ClaudeCodingAgent):
+            def _on_user_message(self, message):
+                self.seen = message
+
+        agent = RecordingAgent(model_name="claude-sonnet-4-5", base_dir=self.temp_dir)
+        message = UserMessage(content=[ToolResultBlock(tool_use_id="1", content="ok")])
+        agent._message_handlers()[UserMessage](message)
+        self.assertIs(agent.seen, message)
+
+    def test_result_message_prefers_structured_output(self):
+        """Test structured_output is returned when present."""
+        from claude_agent_sdk import ResultMessage
+        structured = {"status": True, "summary": "s", "insights": ""}
+        message = ResultMessage(
+            subtype="success",
+            duration_ms=1,
+            duration_api_ms=1,
+            is_error=False,
+            num_turns=1,
+            session_id="session",
+            result="not json",
+            structured_output=structured,
+        )
+        self.assertEqual(self.agent._on_result_message(message), structured)
+
+
+class TestClaudeCodingAgentImport(unittest.TestCase):
+    """Tests for the import cost of the Claude Coding Agent module."""
+
+    def test_import_does_not_load_sdk(self):
+        """Test importing the module defers loading the Claude Agent SDK."""
+        code = (
+            "import sys, kiss.agents.claudecodingagent; "
+            "print('claude_agent_sdk' in sys.modules)"
+        )
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
+
 class TestClaudeCodingAgentRun(unittest.TestCase):
     """Integration tests for ClaudeCodingAgent.run() method.
 
@@ -272,5 +782,28 @@ class TestClaudeCodingAgentRun(unittest.TestCase):
             print(result.get("insights"))
             self.assertIsInstance(result.get("status"), bool)
 
+    def test_agent_arun_many_returns_result_per_task(self):
+        """Test that arun_many returns one result per task in order."""
+        agent = ClaudeCodingAgent(
+            model_name="claude-sonnet-4-5",
+            readable_paths=[str(self.project_root / "src")],
+            writable_paths=[self.output_dir],
+            base_dir=self.temp_dir
+        )
+
+        tasks = [
+            "Write a simple Python function that adds two numbers.",
+            "Write a simple Python function that multiplies two numbers.",
+        ]
+
+        results = asyncio.run(agent.arun_many(tasks, max_concurrency=2))
+
+        self.assertEqual(len(results), len(tasks))
+        for result in results:
+            self.assertIsNotNone(result)
+            self.assertNotIsInstance(result, Exception)
+            if isinstance(result, dict):
+                self.assertIn("status", result)
+
 if __name__ == "__main__":
     unittest.main()